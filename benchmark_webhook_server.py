@@ -9,6 +9,7 @@ Supports asynchronous processing with job queuing.
 import asyncio
 import json
 import logging
+import math
 import uuid
 from datetime import datetime
 from enum import Enum
@@ -35,6 +36,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Longest a status request may be held open waiting for its job (seconds)
+MAX_STATUS_WAIT = 30.0
+
 
 class JobStatus(Enum):
     """Status of benchmark jobs"""
@@ -60,6 +64,8 @@ class BenchmarkJob:
         self.completed_at: Optional[datetime] = None
         self.results: Optional[Dict[str, Any]] = None
         self.error: Optional[str] = None
+        # Set once the job has completed or failed, to wake long-polling requests
+        self.finished = asyncio.Event()
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert job to dictionary"""
@@ -86,13 +92,18 @@ class BenchmarkWebhookServer:
         self.job_queue: asyncio.Queue = asyncio.Queue()
         self.worker_task: Optional[asyncio.Task] = None
 
-    async def start(self):
-        """Start the webhook server"""
+    def make_app(self) -> web.Application:
+        """Build the aiohttp application with the server's routes"""
         app = web.Application()
         app.router.add_post("/webhook/benchmark", self.handle_benchmark_request)
         app.router.add_get("/status/{job_id}", self.handle_status_request)
         app.router.add_get("/health", self.handle_health_check)
         app.router.add_get("/", self.handle_root)
+        return app
+
+    async def start(self):
+        """Start the webhook server"""
+        app = self.make_app()
 
         # Start background worker
         self.worker_task = asyncio.create_task(self.process_jobs())
@@ -123,7 +134,7 @@ class BenchmarkWebhookServer:
                 "version": "1.0.0",
                 "endpoints": {
                     "benchmark": "/webhook/benchmark (POST)",
-                    "status": "/status/{job_id} (GET)",
+                    "status": "/status/{job_id}[?wait=seconds] (GET)",
                     "health": "/health (GET)",
                 },
             }
@@ -202,6 +213,26 @@ class BenchmarkWebhookServer:
             return web.json_response({"error": "Job not found"}, status=404)
 
         job = self.jobs[job_id]
+
+        # Long-poll: with ?wait=<seconds>, hold the request until the job finishes
+        # (or the wait runs out) so clients see completion without re-polling
+        if "wait" in request.query:
+            try:
+                wait = float(request.query["wait"])
+            except ValueError:
+                wait = math.nan
+            # NaN would pass through the clamping below and never time out
+            if not math.isfinite(wait):
+                return web.json_response(
+                    {"error": "'wait' must be a finite number of seconds"}, status=400
+                )
+            wait = min(max(wait, 0), MAX_STATUS_WAIT)
+            if not job.finished.is_set():
+                try:
+                    await asyncio.wait_for(job.finished.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+
         return web.json_response(job.to_dict())
 
     async def process_jobs(self):
@@ -234,6 +265,7 @@ class BenchmarkWebhookServer:
                     job.error = str(e)
 
                 job.completed_at = datetime.now()
+                job.finished.set()
                 self.job_queue.task_done()
 
             except Exception as e:
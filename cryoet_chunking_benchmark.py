@@ -125,7 +125,7 @@ def benchmark_chunk_config(name, data, store_path, chunks, compressor):
     read_time_slice = time.time() - t0
 
     # Verify data integrity
-    assert np.allclose(data, read_back), f"Data mismatch for {name}!"
+    assert np.array_equal(data, read_back), f"Data mismatch for {name}!"
 
     # Metrics
     storage_size = utils.get_directory_size(store_path) / (1024**2)
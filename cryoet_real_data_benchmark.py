@@ -262,7 +262,7 @@ for method_key, method_name, get_compressor in compression_methods:
     print(f"   ✓ Read time: {read_time:.3f}s")
     print(f"   ✓ Compression ratio: {compression_ratio:.2f}x")
     print(f"   ✓ Storage size: {storage_size:.2f} MB")
-    print(f"   ✓ Data integrity: {np.allclose(real_data, read_back)}")
+    print(f"   ✓ Data integrity: {np.array_equal(real_data, read_back)}")
 
 # ============================================================================
 # 8. BENCHMARK SUMMARY
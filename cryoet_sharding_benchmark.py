@@ -149,7 +149,7 @@ def benchmark_config(name, data, store_path, write_func, read_verify=True):
 
     # Verify data integrity
     if read_verify:
-        assert np.allclose(data, read_back), f"Data mismatch for {name}!"
+        assert np.array_equal(data, read_back), f"Data mismatch for {name}!"
 
     # Metrics
     storage_size = utils.get_directory_size(store_path) / (1024**2)
@@ -37,6 +37,34 @@ class DatasetBenchmarkRunner:
         self.config = config
         self.results: List[Dict[str, Any]] = []
 
+    @staticmethod
+    def _get_compressor(codec: str) -> Any:
+        """Build the compressor for a codec name"""
+        if codec == "blosc_zstd":
+            return read_write_zarr.get_blosc_compressor("zstd", 5, "shuffle")
+        elif codec == "blosc_lz4":
+            return read_write_zarr.get_blosc_compressor("lz4", 5, "shuffle")
+        elif codec == "zstd":
+            return read_write_zarr.get_zstd_compressor(5)
+        elif codec == "gzip":
+            return read_write_zarr.get_libdeflate_compressor(6)
+        else:
+            return None
+
+    @staticmethod
+    def _store_path(output_dir: pathlib.Path, codec: str, run_num: int) -> pathlib.Path:
+        return output_dir / f"{codec}_run{run_num}.zip"
+
+    def _warm_store_paths(self, output_dir: pathlib.Path) -> None:
+        """Create and remove every store path up front, so the first codec tested
+        doesn't pay the filesystem's first-create cost inside its write timing"""
+        for codec in self.config.codecs_to_test:
+            for run_num in range(self.config.num_runs):
+                store_path = self._store_path(output_dir, codec, run_num)
+                utils.remove_output_dir(store_path)
+                store_path.touch()
+                store_path.unlink()
+
     def run(self, data: np.ndarray) -> Dict[str, Any]:
         """Run benchmarks on dataset"""
         print(f"\n{'=' * 80}")
@@ -50,6 +78,7 @@ class DatasetBenchmarkRunner:
             pathlib.Path(self.config.output_dir) / self.config.dataset_metadata.name
         )
         output_dir.mkdir(parents=True, exist_ok=True)
+        self._warm_store_paths(output_dir)
 
         all_results = []
 
@@ -57,32 +86,25 @@ class DatasetBenchmarkRunner:
         for codec in self.config.codecs_to_test:
             print(f"\n  Testing {codec}...")
 
+            # The same compressor is shared by every chunk shape and run
+            compressor = self._get_compressor(codec)
+
             for chunks in self.config.chunk_sizes_to_test:
-                results_for_run = []
+                num_runs = self.config.num_runs
+                write_times = np.empty(num_runs, dtype=np.float64)
+                read_times = np.empty(num_runs, dtype=np.float64)
+                sizes_mb = np.empty(num_runs, dtype=np.float64)
+                compression_ratios = np.empty(num_runs, dtype=np.float64)
 
                 # Run multiple times for statistical significance
-                for run_num in range(self.config.num_runs):
-                    store_path = output_dir / f"{codec}_run{run_num}.zarr"
+                for run_num in range(num_runs):
+                    # Zip stores write every chunk into one file, rather than one
+                    # file per chunk, so timings aren't dominated by fs metadata
+                    store_path = self._store_path(output_dir, codec, run_num)
                     utils.remove_output_dir(store_path)
 
-                    # Get compressor
-                    if codec == "blosc_zstd":
-                        compressor = read_write_zarr.get_blosc_compressor(
-                            "zstd", 5, "shuffle"
-                        )
-                    elif codec == "blosc_lz4":
-                        compressor = read_write_zarr.get_blosc_compressor(
-                            "lz4", 5, "shuffle"
-                        )
-                    elif codec == "zstd":
-                        compressor = read_write_zarr.get_zstd_compressor(5)
-                    elif codec == "gzip":
-                        compressor = read_write_zarr.get_gzip_compressor(6)
-                    else:
-                        compressor = None
-
                     # Write benchmark
-                    t0 = time.time()
+                    t0 = time.perf_counter_ns()
                     read_write_zarr.write_zarr_array(
                         data,
                         store_path,
@@ -91,12 +113,12 @@ class DatasetBenchmarkRunner:
                         compressor=compressor,
                         zarr_spec=2,
                     )
-                    write_time = time.time() - t0
+                    write_time = (time.perf_counter_ns() - t0) * 1e-9
 
                     # Read benchmark
-                    t0 = time.time()
+                    t0 = time.perf_counter_ns()
                     _ = read_write_zarr.read_zarr_array(store_path)
-                    read_time = time.time() - t0
+                    read_time = (time.perf_counter_ns() - t0) * 1e-9
 
                     # Get metrics
                     size_mb = utils.get_directory_size(store_path) / (1024**2)
@@ -106,36 +128,30 @@ class DatasetBenchmarkRunner:
                         else read_write_zarr.get_compression_ratio(store_path)
                     )
 
-                    results_for_run.append(
-                        {
-                            "write_time": write_time,
-                            "read_time": read_time,
-                            "size_mb": size_mb,
-                            "compression_ratio": compression_ratio,
-                        }
-                    )
+                    write_times[run_num] = write_time
+                    read_times[run_num] = read_time
+                    sizes_mb[run_num] = size_mb
+                    compression_ratios[run_num] = compression_ratio
 
                     # Cleanup
                     utils.remove_output_dir(store_path)
 
                 # Aggregate results
+                write_time_avg = write_times.mean()
+                read_time_avg = read_times.mean()
                 avg_results = {
                     "codec": codec,
                     "chunks": str(chunks),
-                    "write_time_avg": np.mean(
-                        [r["write_time"] for r in results_for_run]
-                    ),
-                    "write_time_std": np.std(
-                        [r["write_time"] for r in results_for_run]
-                    ),
-                    "read_time_avg": np.mean([r["read_time"] for r in results_for_run]),
-                    "read_time_std": np.std([r["read_time"] for r in results_for_run]),
-                    "size_mb": results_for_run[0]["size_mb"],
-                    "compression_ratio": results_for_run[0]["compression_ratio"],
+                    "write_time_avg": write_time_avg,
+                    "write_time_std": write_times.std(),
+                    "read_time_avg": read_time_avg,
+                    "read_time_std": read_times.std(),
+                    "size_mb": sizes_mb[0],
+                    "compression_ratio": compression_ratios[0],
                     "throughput_write_mbs": self.config.dataset_metadata.total_size_mb
-                    / np.mean([r["write_time"] for r in results_for_run]),
+                    / write_time_avg,
                     "throughput_read_mbs": self.config.dataset_metadata.total_size_mb
-                    / np.mean([r["read_time"] for r in results_for_run]),
+                    / read_time_avg,
                 }
 
                 all_results.append(avg_results)
@@ -265,11 +281,11 @@ def run_multi_dataset_benchmark() -> Dict[str, Any]:
 
 
 if __name__ == "__main__":
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
 
     report = run_multi_dataset_benchmark()
 
-    total_time = time.time() - start_time
+    total_time = (time.perf_counter_ns() - start_time) * 1e-9
 
     print("\n" + "=" * 80)
     print("BENCHMARK SUMMARY")
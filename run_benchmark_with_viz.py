@@ -6,6 +6,7 @@ This script visualizes the sample data BEFORE running benchmarks.
 
 import pathlib
 import time
+from importlib.util import find_spec
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -174,7 +175,17 @@ compression_methods = [
     ("gzip", "GZip", lambda: read_write_zarr.get_gzip_compressor(6, zarr_spec)),
     ("zstd", "Zstd", lambda: read_write_zarr.get_zstd_compressor(5, zarr_spec)),
     ("no_compression", "No Compression", lambda: None),
+    ("zfp", "ZFP (lossy)", lambda: read_write_zarr.get_zfpy_compressor(1e-3, 2)),
 ]
+# ZFPY needs the optional zfpy package, so skip it when that isn't installed
+if find_spec("zfpy") is None:
+    print("\n   (zfpy not installed - skipping the ZFP lossy method)")
+    compression_methods = [m for m in compression_methods if m[0] != "zfp"]
+
+# ZFPY is only available for zarr spec 2, and being lossy it is checked against its
+# error tolerance rather than bit-exactly
+method_zarr_spec = {"zfp": 2}
+integrity_atol = {"zfp": 1e-3}
 
 for idx, (method_key, method_name, get_compressor) in enumerate(
     compression_methods, start=6
@@ -184,20 +195,20 @@ for idx, (method_key, method_name, get_compressor) in enumerate(
     compressor = get_compressor()
 
     utils.remove_output_dir(store_path)
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     read_write_zarr.write_zarr_array(
         sample_image,
         store_path,
         overwrite=False,
         chunks=chunks,
         compressor=compressor,
-        zarr_spec=zarr_spec,
+        zarr_spec=method_zarr_spec.get(method_key, zarr_spec),
     )
-    write_time = time.time() - start_time
+    write_time = (time.perf_counter_ns() - start_time) * 1e-9
 
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     read_image = read_write_zarr.read_zarr_array(store_path)
-    read_time = time.time() - start_time
+    read_time = (time.perf_counter_ns() - start_time) * 1e-9
 
     compression_ratio = read_write_zarr.get_compression_ratio(store_path)
     storage_size = utils.get_directory_size(store_path) / (1024**2)
@@ -213,7 +224,9 @@ for idx, (method_key, method_name, get_compressor) in enumerate(
     print(f"   ✓ Read time: {read_time:.3f}s")
     print(f"   ✓ Compression ratio: {compression_ratio:.2f}x")
     print(f"   ✓ Storage size: {storage_size:.2f} MB")
-    print(f"   ✓ Data integrity: {np.allclose(sample_image, read_image)}")
+    atol = integrity_atol.get(method_key, 0.0)
+    intact = utils.arrays_match(sample_image, read_image, atol=atol)
+    print(f"   ✓ Data integrity: {intact}")
 
 # ============================================================================
 # 7. SUMMARY TABLE
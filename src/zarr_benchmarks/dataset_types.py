@@ -6,6 +6,8 @@ Supports various imaging modalities with specific metadata and validation.
 
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import cached_property, lru_cache
+from math import prod
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
@@ -36,6 +38,45 @@ class CompressionProfile(Enum):
     ANALYSIS = "analysis"  # Optimized for analysis workflows
 
 
+# Profile-specific adjustments to the target chunk size
+_PROFILE_MULT = {
+    CompressionProfile.ARCHIVAL: 2.0,  # Larger chunks for better compression
+    CompressionProfile.BALANCED: 1.0,  # Standard size
+    CompressionProfile.FAST: 0.5,  # Smaller chunks for faster access
+    CompressionProfile.LOSSLESS: 1.5,  # Moderate chunks
+    CompressionProfile.ANALYSIS: 1.0,  # Analysis-optimized
+}
+
+
+@lru_cache(maxsize=128)
+def _suggest_chunk_size(
+    shape: Tuple[int, ...],
+    itemsize: int,
+    target_mb: float,
+    compression_profile: CompressionProfile,
+) -> Tuple[int, ...]:
+    """Memoized implementation of DatasetMetadata.suggest_chunk_size"""
+    target_mb *= _PROFILE_MULT[compression_profile]
+    target_bytes = target_mb * 1024 * 1024
+    target_elements = int(target_bytes / itemsize)
+
+    # Start with equal division across dimensions
+    ndims = len(shape)
+    chunk_size_1d = int(target_elements ** (1.0 / ndims))
+
+    # Build chunk shape
+    chunks = []
+    for dim_size in shape:
+        chunk_dim = min(chunk_size_1d, dim_size)
+        # Round down to power of 2 for better performance (integer bit trick, so
+        # no float rounding; empty dimensions would otherwise be a negative shift)
+        chunk_dim = 1 << (chunk_dim.bit_length() - 1) if chunk_dim > 0 else 1
+        chunk_dim = max(16, min(chunk_dim, 512))  # Clamp to reasonable range
+        chunks.append(chunk_dim)
+
+    return tuple(chunks)
+
+
 @dataclass
 class DatasetMetadata:
     """Metadata describing a dataset"""
@@ -64,10 +105,10 @@ class DatasetMetadata:
         """Number of dimensions"""
         return len(self.shape)
 
-    @property
+    @cached_property
     def total_size_bytes(self) -> int:
         """Total size in bytes"""
-        return int(np.prod(self.shape) * self.dtype.itemsize)
+        return int(prod(self.shape) * self.dtype.itemsize)
 
     @property
     def total_size_mb(self) -> float:
@@ -91,33 +132,13 @@ class DatasetMetadata:
             target_mb: Target chunk size in MB
             compression_profile: Compression profile to optimize for
         """
-        # Profile-specific adjustments
-        profile_multipliers = {
-            CompressionProfile.ARCHIVAL: 2.0,  # Larger chunks for better compression
-            CompressionProfile.BALANCED: 1.0,  # Standard size
-            CompressionProfile.FAST: 0.5,  # Smaller chunks for faster access
-            CompressionProfile.LOSSLESS: 1.5,  # Moderate chunks
-            CompressionProfile.ANALYSIS: 1.0,  # Analysis-optimized
-        }
-
-        target_mb *= profile_multipliers[compression_profile]
-        target_bytes = target_mb * 1024 * 1024
-        target_elements = int(target_bytes / self.dtype.itemsize)
-
-        # Start with equal division across dimensions
-        ndims = len(self.shape)
-        chunk_size_1d = int(target_elements ** (1.0 / ndims))
-
-        # Build chunk shape
-        chunks = []
-        for dim_size in self.shape:
-            chunk_dim = min(chunk_size_1d, dim_size)
-            # Round to power of 2 for better performance
-            chunk_dim = 2 ** int(np.log2(chunk_dim))
-            chunk_dim = max(16, min(chunk_dim, 512))  # Clamp to reasonable range
-            chunks.append(chunk_dim)
-
-        return tuple(chunks)
+        # Shapes may hold NumPy integers, which have no int.bit_length
+        return _suggest_chunk_size(
+            tuple(int(s) for s in self.shape),
+            self.dtype.itemsize,
+            target_mb,
+            compression_profile,
+        )
 
     def suggest_compression(self) -> str:
         """Suggest best compression codec based on dataset type"""
@@ -34,10 +34,18 @@ def _open_zarr_array(
     ).result()
 
 
-def read_zarr_array(store_path: pathlib.Path, zarr_spec: Literal[2, 3]) -> npt.NDArray:
-    """Read the v2/v3 zarr spec with tensorstore"""
+def read_zarr_array(
+    store_path: pathlib.Path,
+    zarr_spec: Literal[2, 3],
+    out: npt.NDArray | None = None,
+) -> npt.NDArray:
+    """Read the v2/v3 zarr spec with tensorstore, into `out` if given"""
     zarr_read = _open_zarr_array(store_path, zarr_spec)
     read_image = zarr_read[:].read().result()
+    if out is not None:
+        # tensorstore has no read-into-buffer API, so copy into `out`
+        out[...] = read_image
+        return out
     return read_image
 
 
@@ -182,6 +190,17 @@ def get_gzip_compressor(level: int, zarr_spec: Literal[2, 3]) -> dict:
         return {"name": "gzip", "configuration": {"level": level}}
 
 
+def get_libdeflate_compressor(level: int, zarr_spec: Literal[2, 3]) -> dict:
+    # tensorstore already compresses gzip natively in C++, so there is no python zlib
+    # overhead to replace
+    return get_gzip_compressor(level, zarr_spec)
+
+
+def get_zfpy_compressor(tolerance: float, zarr_spec: Literal[2, 3]) -> dict:
+    # tensorstore's zarr drivers have no ZFP codec
+    raise ValueError("zfpy is not supported by tensorstore")
+
+
 def get_zstd_compressor(level: int, zarr_spec: Literal[2, 3]) -> dict:
     if zarr_spec == 2:
         return {"id": "zstd", "level": level}
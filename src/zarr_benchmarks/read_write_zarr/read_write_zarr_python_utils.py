@@ -1,6 +1,12 @@
+import contextlib
+import pathlib
+from collections.abc import Callable
+from importlib.util import find_spec
 from typing import Literal
 
 import numcodecs
+from numcodecs import GZip
+from numcodecs.compat import ensure_contiguous_ndarray, ndarray_copy
 
 
 def get_numcodec_shuffle(shuffle: Literal["shuffle", "noshuffle", "bitshuffle"]) -> int:
@@ -13,3 +19,54 @@ def get_numcodec_shuffle(shuffle: Literal["shuffle", "noshuffle", "bitshuffle"])
             return numcodecs.Blosc.BITSHUFFLE
         case _:
             raise ValueError(f"invalid shuffle value for blosc {shuffle}")
+
+
+def open_store(
+    store_path: pathlib.Path,
+    mode: Literal["r", "w-"],
+    zip_store: Callable[..., contextlib.AbstractContextManager],
+) -> contextlib.AbstractContextManager:
+    """Open a single-file zip store for .zip paths (with `zip_store`, the backend's
+    ZipStore class), otherwise use a directory store. As for a directory store, mode
+    "w-" fails if the store already exists (opening a zip for writing would otherwise
+    silently truncate it)"""
+    if store_path.suffix == ".zip":
+        if mode == "w-" and store_path.exists():
+            raise FileExistsError(f"store already exists: {store_path}")
+        return zip_store(str(store_path), mode="r" if mode == "r" else "w")
+    return contextlib.nullcontext(store_path)
+
+
+class LibdeflateGZip(GZip):
+    """GZip codec that compresses with libdeflate (via the optional `deflate` package)
+    rather than the standard library's zlib. The output is a standard gzip stream, so
+    the codec keeps the "gzip" id and stores can be read by any zarr implementation.
+    """
+
+    def encode(self, buf):
+        import deflate
+
+        buf = ensure_contiguous_ndarray(buf)
+        return bytes(deflate.gzip_compress(buf, self.level))
+
+    def decode(self, buf, out=None):
+        import deflate
+
+        buf = ensure_contiguous_ndarray(buf)
+        return ndarray_copy(deflate.gzip_decompress(buf), out)
+
+
+def get_libdeflate_gzip(level: int) -> GZip:
+    """LibdeflateGZip when the optional `deflate` package is installed, otherwise
+    numcodecs' zlib-based GZip (which writes the same format).
+
+    Side effect: when libdeflate is available, LibdeflateGZip is registered as the
+    process-wide "gzip" codec, so from then on every gzip-compressed array opened in
+    this process (not just ones written with this compressor) decodes with
+    libdeflate. zarr re-creates compressors from their codec id when opening an
+    array, so without the registration LibdeflateGZip would only be used on write.
+    """
+    if find_spec("deflate") is None:
+        return GZip(level=level)
+    numcodecs.register_codec(LibdeflateGZip)
+    return LibdeflateGZip(level=level)
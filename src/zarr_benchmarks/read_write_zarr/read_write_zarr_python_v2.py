@@ -1,3 +1,4 @@
+import functools
 import pathlib
 from typing import Literal
 
@@ -9,17 +10,26 @@ from numcodecs import Blosc, GZip, Zstd
 from zarr_benchmarks import utils
 from zarr_benchmarks.read_write_zarr import read_write_zarr_python_utils
 
+_open_store = functools.partial(
+    read_write_zarr_python_utils.open_store, zip_store=zarr.ZipStore
+)
+
 
 def get_compression_ratio(store_path: pathlib.Path, **_) -> float:
-    zarr_array = zarr.open_array(store_path, mode="r")
-    compression_ratio = zarr_array.nbytes / zarr_array.nbytes_stored
+    with _open_store(store_path, mode="r") as store:
+        zarr_array = zarr.open_array(store, mode="r")
+        compression_ratio = zarr_array.nbytes / zarr_array.nbytes_stored
 
     return compression_ratio
 
 
-def read_zarr_array(store_path: pathlib.Path, **_) -> npt.NDArray:
-    zarr_read = zarr.open_array(store_path, mode="r")
-    read_image = zarr_read[:]
+def read_zarr_array(
+    store_path: pathlib.Path, out: npt.NDArray | None = None, **_
+) -> npt.NDArray:
+    """Read the full array, into `out` if given rather than a newly allocated array"""
+    with _open_store(store_path, mode="r") as store:
+        zarr_read = zarr.open_array(store, mode="r")
+        read_image = zarr_read.get_basic_selection(..., out=out)
     return read_image
 
 
@@ -36,18 +46,23 @@ def write_zarr_array(
     if overwrite:
         utils.remove_output_dir(store_path)
 
-    zarr_array = zarr.open_array(
-        store=store_path,
-        mode="w-",
-        shape=image.shape,
-        chunks=chunks,
-        dtype=image.dtype,
-        compressor=compressor,
-        zarr_version=zarr_spec,
-        fill_value=0,
-        write_empty_chunks=write_empty_chunks,
-    )
-    zarr_array[:] = image
+    with _open_store(store_path, mode="w-") as store:
+        zarr_array = zarr.open_array(
+            store=store,
+            mode="w-",
+            shape=image.shape,
+            chunks=chunks,
+            dtype=image.dtype,
+            compressor=compressor,
+            zarr_version=zarr_spec,
+            # chunks fully covered by the write are encoded straight from `image`
+            # without fill-initialisation (only partial edge chunks are filled),
+            # and write_empty_chunks=False compares chunks against this value, so
+            # it is kept explicit rather than None
+            fill_value=0,
+            write_empty_chunks=write_empty_chunks,
+        )
+        zarr_array[:] = image
 
 
 def get_blosc_compressor(
@@ -64,5 +79,17 @@ def get_gzip_compressor(level: int, **_) -> numcodecs.abc.Codec:
     return GZip(level=level)
 
 
+def get_libdeflate_compressor(level: int, **_) -> numcodecs.abc.Codec:
+    return read_write_zarr_python_utils.get_libdeflate_gzip(level)
+
+
 def get_zstd_compressor(level: int, **_) -> numcodecs.abc.Codec:
     return Zstd(level=level)
+
+
+def get_zfpy_compressor(tolerance: float, **_) -> numcodecs.abc.Codec:
+    """Lossy ZFP compressor in fixed-accuracy mode (absolute error <= tolerance)"""
+    # numcodecs only provides ZFPY when the optional zfpy package is installed
+    from numcodecs.zfpy import ZFPY
+
+    return ZFPY(tolerance=tolerance)
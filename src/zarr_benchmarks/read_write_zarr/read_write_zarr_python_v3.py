@@ -1,3 +1,4 @@
+import functools
 import pathlib
 from typing import Any, Literal
 
@@ -5,21 +6,36 @@ import numpy.typing as npt
 import zarr
 from numcodecs import Blosc, GZip, Zstd
 from zarr.codecs import BloscCodec, GzipCodec, ZstdCodec
+from zarr.core.buffer import default_buffer_prototype
 
 from zarr_benchmarks import utils
 from zarr_benchmarks.read_write_zarr import read_write_zarr_python_utils
 
+_open_store = functools.partial(
+    read_write_zarr_python_utils.open_store, zip_store=zarr.storage.ZipStore
+)
+
 
 def get_compression_ratio(store_path: pathlib.Path, **_) -> float:
-    zarr_array = zarr.open_array(store_path, mode="r")
-    compression_ratio = zarr_array.nbytes / zarr_array.nbytes_stored()
+    with _open_store(store_path, mode="r") as store:
+        zarr_array = zarr.open_array(store, mode="r")
+        compression_ratio = zarr_array.nbytes / zarr_array.nbytes_stored()
 
     return compression_ratio
 
 
-def read_zarr_array(store_path: pathlib.Path, **_) -> npt.NDArray:
-    zarr_read = zarr.open_array(store_path, mode="r")
-    read_image = zarr_read[:]
+def read_zarr_array(
+    store_path: pathlib.Path, out: npt.NDArray | None = None, **_
+) -> npt.NDArray:
+    """Read the full array, into `out` if given rather than a newly allocated array"""
+    out_buffer = (
+        default_buffer_prototype().nd_buffer.from_numpy_array(out)
+        if out is not None
+        else None
+    )
+    with _open_store(store_path, mode="r") as store:
+        zarr_read = zarr.open_array(store, mode="r")
+        read_image = zarr_read.get_basic_selection(..., out=out_buffer)
     return read_image
 
 
@@ -36,17 +52,22 @@ def write_zarr_array(
     if overwrite:
         utils.remove_output_dir(store_path)
 
-    zarr_array = zarr.create_array(
-        store=store_path,
-        shape=image.shape,
-        chunks=chunks,
-        dtype=image.dtype,
-        compressors=compressor,
-        zarr_format=zarr_spec,
-        fill_value=0,
-        config={"write_empty_chunks": write_empty_chunks},
-    )
-    zarr_array[:] = image
+    with _open_store(store_path, mode="w-") as store:
+        zarr_array = zarr.create_array(
+            store=store,
+            shape=image.shape,
+            chunks=chunks,
+            dtype=image.dtype,
+            compressors=compressor,
+            zarr_format=zarr_spec,
+            # chunks fully covered by the write are encoded straight from `image`
+            # without fill-initialisation (only partial edge chunks are filled),
+            # and write_empty_chunks=False compares chunks against this value, so
+            # it is kept explicit rather than None
+            fill_value=0,
+            config={"write_empty_chunks": write_empty_chunks},
+        )
+        zarr_array[:] = image
 
 
 def get_blosc_compressor(
@@ -73,6 +94,16 @@ def get_gzip_compressor(level: int, zarr_spec: Literal[2, 3]) -> Any:
         raise ValueError(f"invalid zarr spec version {zarr_spec}")
 
 
+def get_libdeflate_compressor(level: int, zarr_spec: Literal[2, 3]) -> Any:
+    if zarr_spec == 2:
+        return read_write_zarr_python_utils.get_libdeflate_gzip(level)
+    elif zarr_spec == 3:
+        # zarr-python v3's GzipCodec has no hook for swapping the zlib implementation
+        raise ValueError("libdeflate gzip is only supported for zarr spec 2")
+    else:
+        raise ValueError(f"invalid zarr spec version {zarr_spec}")
+
+
 def get_zstd_compressor(level: int, zarr_spec: Literal[2, 3]) -> Any:
     if zarr_spec == 2:
         return Zstd(level=level)
@@ -80,3 +111,17 @@ def get_zstd_compressor(level: int, zarr_spec: Literal[2, 3]) -> Any:
         return ZstdCodec(level=level)
     else:
         raise ValueError(f"invalid zarr spec version {zarr_spec}")
+
+
+def get_zfpy_compressor(tolerance: float, zarr_spec: Literal[2, 3]) -> Any:
+    """Lossy ZFP compressor in fixed-accuracy mode (absolute error <= tolerance)"""
+    if zarr_spec == 2:
+        # numcodecs only provides ZFPY when the optional zfpy package is installed
+        from numcodecs.zfpy import ZFPY
+
+        return ZFPY(tolerance=tolerance)
+    elif zarr_spec == 3:
+        # numcodecs.zarr3.ZFPY rejects the non-contiguous chunk views zarr passes it
+        raise ValueError("zfpy is only supported for zarr spec 2")
+    else:
+        raise ValueError(f"invalid zarr spec version {zarr_spec}")
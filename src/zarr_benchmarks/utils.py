@@ -1,10 +1,14 @@
 import json
+import math
 import os
 import pathlib
 import shutil
 from importlib.metadata import version
 from importlib.util import find_spec
 
+import numpy as np
+import numpy.typing as npt
+
 
 def is_zarr_python_v2() -> bool:
     """
@@ -17,14 +21,21 @@ def is_zarr_python_v2() -> bool:
 
 
 def remove_output_dir(output_dir: pathlib.Path) -> None:
-    if output_dir.exists():
+    if output_dir.is_file():
+        # single-file stores, e.g. zip
+        output_dir.unlink()
+    elif output_dir.exists():
         shutil.rmtree(output_dir)
 
 
 def get_directory_size(path: pathlib.Path) -> int:
     """
-    Get total size of a directory in bytes.
+    Get total size of a directory in bytes. Single-file stores (e.g. zip) return the
+    size of the file.
     """
+    if path.is_file():
+        return os.path.getsize(path)
+
     total_size = 0
     if not path.is_dir():
         raise ValueError(f"Path not a directory: {path}")
@@ -36,6 +47,47 @@ def get_directory_size(path: pathlib.Path) -> int:
     return total_size
 
 
+def arrays_match(expected: npt.NDArray, actual: npt.NDArray, atol: float = 0.0) -> bool:
+    """
+    Check an array read back from a store against the one written. With atol=0
+    (lossless codecs) they must be bit-identical; otherwise they are compared with
+    np.allclose a slab of the first axis at a time, so its temporaries stay slab-sized
+    rather than the size of the whole array.
+    """
+    if atol == 0:
+        return np.array_equal(expected, actual)
+    if expected.shape != actual.shape:
+        return False
+    slab = 64
+    return all(
+        np.allclose(expected[i : i + slab], actual[i : i + slab], atol=atol)
+        for i in range(0, expected.shape[0], slab)
+    )
+
+
+def pearson_correlation(a: npt.NDArray, b: npt.NDArray) -> float:
+    """
+    Pearson correlation of two arrays from their sums and dot products. Like
+    np.corrcoef, returns NaN when either array is constant and clips to [-1, 1].
+    """
+    # Accumulate in float64 - the one-pass formula cancels badly in float32
+    a = a.ravel().astype(np.float64, copy=False)
+    b = b.ravel().astype(np.float64, copy=False)
+    n = a.size
+    sa = a.sum()
+    sb = b.sum()
+    sq_a = n * np.dot(a, a)
+    sq_b = n * np.dot(b, b)
+    cov = n * np.dot(a, b) - sa * sb
+    var_a = sq_a - sa * sa
+    var_b = sq_b - sb * sb
+    # The one-pass variance of a constant can be rounding noise rather than
+    # exactly zero, so it is compared relative to the sum of squares
+    if var_a <= 1e-12 * sq_a or var_b <= 1e-12 * sq_b:
+        return float("nan")
+    return max(-1.0, min(1.0, cov / math.sqrt(var_a * var_b)))
+
+
 def read_json_file(path_to_file: pathlib.Path) -> dict:
     with open(path_to_file, "r") as f:
         return json.load(f)
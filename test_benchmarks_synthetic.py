@@ -7,17 +7,23 @@ and demonstrations without requiring CryoET Portal downloads.
 Runtime: ~30-60 seconds for full suite
 """
 
+import multiprocessing
 import os
 import pathlib
 import sys
+import tempfile
 import time
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from itertools import repeat
+from multiprocessing import shared_memory
 
 import numpy as np
 import pandas as pd
 from skimage.metrics import peak_signal_noise_ratio as psnr
 from skimage.metrics import structural_similarity as ssim
 
-from test_data_generator import generate_synthetic_volume, get_test_dataset_info
+from test_data_generator import get_test_dataset_info, load_synthetic_volume
 from zarr_benchmarks import utils
 from zarr_benchmarks.read_write_zarr import read_write_zarr
 
@@ -25,80 +31,212 @@ from zarr_benchmarks.read_write_zarr import read_write_zarr
 os.environ["ZARR_V3_EXPERIMENTAL_API"] = "1"
 
 
-def test_compression_codecs(data: np.ndarray, output_dir: pathlib.Path):
+if find_spec("numba"):
+    import numba
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _fused_error_stats(a, b):
+        """Mean absolute, mean squared and max absolute error in a single pass"""
+        a = a.ravel()
+        b = b.ravel()
+        abs_sum = 0.0
+        sq_sum = 0.0
+        max_abs = 0.0
+        for i in numba.prange(a.size):
+            d = np.float64(a[i]) - np.float64(b[i])
+            abs_sum += abs(d)
+            sq_sum += d * d
+            max_abs = max(max_abs, abs(d))
+        return abs_sum / a.size, sq_sum / a.size, max_abs
+
+else:
+    # numba is optional - without it the error stats fall back to NumPy passes
+    _fused_error_stats = None
+
+
+def _count_files(path: pathlib.Path) -> int:
+    """Count the files under a directory tree"""
+    # DirEntry.is_dir uses the file type returned by readdir, so unlike
+    # Path.rglob + is_file this doesn't stat every entry
+    count = 0
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    count += 1
+    return count
+
+
+def _run_one_codec(
+    codec: str,
+    data: np.ndarray,
+    output_dir: pathlib.Path,
+    level: int,
+    chunk_size: int,
+    read_buf: np.ndarray | None = None,
+) -> dict:
+    """Write, read and measure one codec, returning its result row"""
+    store_path = output_dir / f"compression_test_{codec}.zarr"
+
+    try:
+        # Setup compressor
+        if codec == "no_compression":
+            compressor = None
+        elif "blosc" in codec:
+            cname = codec.split("_")[1]
+            compressor = read_write_zarr.get_blosc_compressor(cname, level, "shuffle")
+        elif codec == "zstd":
+            compressor = read_write_zarr.get_zstd_compressor(level)
+        elif codec == "gzip":
+            compressor = read_write_zarr.get_gzip_compressor(level)
+        else:
+            compressor = None
+
+        # Write
+        t0 = time.time()
+        read_write_zarr.write_zarr_array(
+            data,
+            store_path,
+            overwrite=False,
+            chunks=(chunk_size, chunk_size, chunk_size),
+            compressor=compressor,
+            zarr_spec=2,
+        )
+        write_time = time.time() - t0
+
+        # Read
+        t0 = time.time()
+        read_write_zarr.read_zarr_array(store_path, out=read_buf)
+        read_time = time.time() - t0
+
+        # Metrics
+        size_mb = utils.get_directory_size(store_path) / (1024**2)
+        ratio = (
+            1.0
+            if codec == "no_compression"
+            else read_write_zarr.get_compression_ratio(store_path)
+        )
+
+        return {
+            "codec": codec,
+            "write_time": write_time,
+            "read_time": read_time,
+            "size_mb": size_mb,
+            "ratio": ratio,
+            "success": True,
+        }
+
+    except Exception as e:
+        return {"codec": codec, "success": False, "error": str(e)}
+
+
+def _set_blosc_threads(nthreads: int) -> int:
+    """Set how many threads blosc splits each chunk's (de)compression across, returning
+    the previous count"""
+    from numcodecs import blosc
+
+    return blosc.set_nthreads(nthreads)
+
+
+# Per-worker view of the shared input volume, set up by _attach_shared_volume
+_worker_shm = None
+_worker_data = None
+_worker_read_buf = None
+
+
+def _attach_shared_volume(name: str, shape: tuple, dtype: str, blosc_threads: int = 1):
+    """Process pool initializer mapping the shared input volume into a worker"""
+    global _worker_shm, _worker_data, _worker_read_buf
+    _set_blosc_threads(blosc_threads)
+    # The parent owns (and unlinks) the segment, so don't track it here as well
+    _worker_shm = shared_memory.SharedMemory(name=name, track=False)
+    _worker_data = np.ndarray(shape, dtype=dtype, buffer=_worker_shm.buf)
+    _worker_read_buf = np.empty_like(_worker_data)
+
+
+def _run_one_codec_in_worker(
+    codec: str, output_dir: pathlib.Path, level: int, chunk_size: int
+) -> dict:
+    return _run_one_codec(
+        codec, _worker_data, output_dir, level, chunk_size, _worker_read_buf
+    )
+
+
+def test_compression_codecs(
+    data: np.ndarray, output_dir: pathlib.Path, parallel: bool = True
+):
     """Test different compression codecs"""
     print("\n" + "=" * 70)
     print("TEST 1: Compression Codecs")
     print("=" * 70)
 
-    results = []
     codecs = ["blosc_zstd", "blosc_lz4", "blosc_zlib", "zstd", "gzip", "no_compression"]
     level = 5
     chunk_size = 64
 
-    for codec in codecs:
-        print(f"\n  Testing {codec}...", end=" ")
-
-        store_path = output_dir / f"compression_test_{codec}.zarr"
-        utils.remove_output_dir(store_path)
-
+    # Codecs are independent, so by default each runs in its own worker process;
+    # parallel=False gives single-process timings that don't compete for cores
+    n_cores = os.cpu_count() or 1
+    if parallel:
+        n_workers = min(len(codecs), n_cores)
+        # Share the input volume with the workers rather than pickling it per task
+        shm = shared_memory.SharedMemory(create=True, size=data.nbytes)
         try:
-            # Setup compressor
-            if codec == "no_compression":
-                compressor = None
-            elif "blosc" in codec:
-                cname = codec.split("_")[1]
-                compressor = read_write_zarr.get_blosc_compressor(
-                    cname, level, "shuffle"
+            np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf)[...] = data
+            # Spawn rather than fork the workers - the parent may already be running
+            # threads (e.g. numba's, from generating the volume), which fork can
+            # leave deadlocked
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_attach_shared_volume,
+                # The workers split the cores between them for blosc's threads
+                initargs=(
+                    shm.name,
+                    data.shape,
+                    data.dtype.str,
+                    max(1, n_cores // n_workers),
+                ),
+            ) as executor:
+                results = list(
+                    executor.map(
+                        _run_one_codec_in_worker,
+                        codecs,
+                        repeat(output_dir),
+                        repeat(level),
+                        repeat(chunk_size),
+                    )
                 )
-            elif codec == "zstd":
-                compressor = read_write_zarr.get_zstd_compressor(level)
-            elif codec == "gzip":
-                compressor = read_write_zarr.get_gzip_compressor(level)
-            else:
-                compressor = None
-
-            # Write
-            t0 = time.time()
-            read_write_zarr.write_zarr_array(
-                data,
-                store_path,
-                overwrite=False,
-                chunks=(chunk_size, chunk_size, chunk_size),
-                compressor=compressor,
-                zarr_spec=2,
-            )
-            write_time = time.time() - t0
-
-            # Read
-            t0 = time.time()
-            _ = read_write_zarr.read_zarr_array(store_path)  # Read for timing only
-            read_time = time.time() - t0
-
-            # Metrics
-            size_mb = utils.get_directory_size(store_path) / (1024**2)
-            ratio = (
-                1.0
-                if codec == "no_compression"
-                else read_write_zarr.get_compression_ratio(store_path)
-            )
-
-            results.append(
-                {
-                    "codec": codec,
-                    "write_time": write_time,
-                    "read_time": read_time,
-                    "size_mb": size_mb,
-                    "ratio": ratio,
-                    "success": True,
-                }
+        finally:
+            shm.close()
+            shm.unlink()
+    else:
+        # A single codec runs at a time, so blosc can use every core - restored
+        # afterwards, so the later tests run with the same threading in either mode
+        prev_blosc_threads = _set_blosc_threads(n_cores)
+        try:
+            # Every codec reads back into the same buffer, rather than allocating a
+            # new volume
+            read_buf = np.empty_like(data)
+            results = [
+                _run_one_codec(codec, data, output_dir, level, chunk_size, read_buf)
+                for codec in codecs
+            ]
+        finally:
+            _set_blosc_threads(prev_blosc_threads)
+
+    for result in results:
+        print(f"\n  Testing {result['codec']}...", end=" ")
+        if result["success"]:
+            print(
+                f"✓ W:{result['write_time']:.3f}s R:{result['read_time']:.3f}s "
+                f"{result['ratio']:.2f}×"
             )
-
-            print(f"✓ W:{write_time:.3f}s R:{read_time:.3f}s {ratio:.2f}×")
-
-        except Exception as e:
-            print(f"✗ {e}")
-            results.append({"codec": codec, "success": False, "error": str(e)})
+        else:
+            print(f"✗ {result['error']}")
 
     return pd.DataFrame(results)
 
@@ -120,7 +258,6 @@ def test_zarr_versions(data: np.ndarray, output_dir: pathlib.Path):
         print(f"\n  Testing v{version}...", end=" ")
 
         store_path = output_dir / f"version_test_v{version}.zarr"
-        utils.remove_output_dir(store_path)
 
         try:
             compressor = read_write_zarr.get_blosc_compressor("zstd", level, "shuffle")
@@ -147,9 +284,7 @@ def test_zarr_versions(data: np.ndarray, output_dir: pathlib.Path):
             ratio = read_write_zarr.get_compression_ratio(store_path)
 
             # Count files
-            file_count = sum(
-                1 for _ in pathlib.Path(store_path).rglob("*") if _.is_file()
-            )
+            file_count = _count_files(store_path)
 
             results.append(
                 {
@@ -190,7 +325,6 @@ def test_chunking_strategies(data: np.ndarray, output_dir: pathlib.Path):
         print(f"\n  Testing {chunk_size}³...", end=" ")
 
         store_path = output_dir / f"chunk_test_{chunk_size}.zarr"
-        utils.remove_output_dir(store_path)
 
         try:
             compressor = read_write_zarr.get_blosc_compressor("zstd", level, "shuffle")
@@ -214,9 +348,7 @@ def test_chunking_strategies(data: np.ndarray, output_dir: pathlib.Path):
 
             # Metrics
             size_mb = utils.get_directory_size(store_path) / (1024**2)
-            file_count = sum(
-                1 for _ in pathlib.Path(store_path).rglob("*") if _.is_file()
-            )
+            file_count = _count_files(store_path)
 
             results.append(
                 {
@@ -250,12 +382,20 @@ def test_data_integrity(data: np.ndarray, output_dir: pathlib.Path):
     codecs = ["blosc_zstd", "blosc_lz4", "blosc_zlib", "zstd", "gzip"]
     level = 5
     chunk_size = 64
+    read_buf = np.empty_like(data)
+    diff_buf = np.empty_like(data) if _fused_error_stats is None else None
+
+    # The original volume is the same for every codec, so its range and normalised
+    # middle slice (for SSIM) are only computed once
+    data_min = data.min()
+    data_range = data.max() - data_min
+    mid = data.shape[0] // 2
+    orig_mid = (data[mid] - data_min) / (data_range + 1e-10)
 
     for codec in codecs:
         print(f"\n  Testing {codec}...", end=" ")
 
         store_path = output_dir / f"integrity_test_{codec}.zarr"
-        utils.remove_output_dir(store_path)
 
         try:
             if "blosc" in codec:
@@ -279,30 +419,44 @@ def test_data_integrity(data: np.ndarray, output_dir: pathlib.Path):
                 compressor=compressor,
                 zarr_spec=2,
             )
-            read_back = read_write_zarr.read_zarr_array(store_path)
+            read_back = read_write_zarr.read_zarr_array(store_path, out=read_buf)
 
             # Calculate metrics
             is_exact = np.array_equal(data, read_back)
 
-            # SSIM on middle slice
-            orig_norm = (data - data.min()) / (data.max() - data.min() + 1e-10)
-            read_norm = (read_back - read_back.min()) / (
-                read_back.max() - read_back.min() + 1e-10
-            )
-            mid = data.shape[0] // 2
-            ssim_val = ssim(orig_norm[mid], read_norm[mid], data_range=1.0)
-
-            # PSNR
-            data_range = data.max() - data.min()
-            psnr_val = psnr(data, read_back, data_range=data_range)
-
-            # Additional metrics
-            from skimage.metrics import mean_squared_error as mse_func
-
-            mse_val = mse_func(data, read_back)
-            mae_val = np.mean(np.abs(data - read_back))  # Mean Absolute Error
-            max_error = np.max(np.abs(data - read_back))
-            correlation = np.corrcoef(data.flat, read_back.flat)[0, 1]
+            if is_exact:
+                # A bit-exact round trip has known metric values, so skip the
+                # full-volume passes needed to compute them
+                ssim_val = 1.0
+                psnr_val = float("inf")
+                mse_val = mae_val = max_error = 0.0
+                correlation = 1.0
+            else:
+                # SSIM on middle slice, normalised by the volume's range (only the
+                # slice itself is rescaled, not the whole volume)
+                read_min = read_back.min()
+                read_mid = (read_back[mid] - read_min) / (
+                    read_back.max() - read_min + 1e-10
+                )
+                ssim_val = ssim(orig_mid, read_mid, data_range=1.0)
+
+                # PSNR
+                psnr_val = psnr(data, read_back, data_range=data_range)
+
+                # Additional metrics
+                if _fused_error_stats is not None:
+                    mae_val, mse_val, max_error = _fused_error_stats(data, read_back)
+                else:
+                    from skimage.metrics import mean_squared_error as mse_func
+
+                    mse_val = mse_func(data, read_back)
+                    # Absolute error computed once, in place, for both MAE and max
+                    # error
+                    np.subtract(data, read_back, out=diff_buf)
+                    np.abs(diff_buf, out=diff_buf)
+                    mae_val = diff_buf.mean()  # Mean Absolute Error
+                    max_error = diff_buf.max()
+                correlation = utils.pearson_correlation(data, read_back)
 
             results.append(
                 {
@@ -341,7 +495,7 @@ def main():
 
     # Generate test data
     print("\nGenerating synthetic test data...")
-    data = generate_synthetic_volume(size=128, pattern="realistic")
+    data = load_synthetic_volume(size=128, pattern="realistic")
     info = get_test_dataset_info("realistic")
 
     print(f"  Pattern: {info['name']}")
@@ -353,10 +507,24 @@ def main():
     start_time = time.time()
 
     results = {}
-    results["compression"] = test_compression_codecs(data, output_dir)
-    results["versions"] = test_zarr_versions(data, output_dir)
-    results["chunking"] = test_chunking_strategies(data, output_dir)
-    results["integrity"] = test_data_integrity(data, output_dir)
+    # ZARR_BENCH_SEQUENTIAL=1 runs the codec sweep in a single process, for
+    # timings that aren't sharing cores and memory bandwidth with other codecs
+    sequential = os.environ.get("ZARR_BENCH_SEQUENTIAL", "0") == "1"
+    # The stores are throwaway, so they're written to a fresh scratch directory
+    # that is removed in one go at the end, rather than each test deleting the
+    # previous run's store first. ZARR_BENCH_TMPFS=1 puts it on tmpfs, so the
+    # timings measure the codecs rather than the disk
+    tmpfs = os.environ.get("ZARR_BENCH_TMPFS", "0") == "1"
+    with tempfile.TemporaryDirectory(
+        prefix="stores_", dir="/dev/shm" if tmpfs else output_dir
+    ) as store_dir:
+        store_dir = pathlib.Path(store_dir)
+        results["compression"] = test_compression_codecs(
+            data, store_dir, parallel=not sequential
+        )
+        results["versions"] = test_zarr_versions(data, store_dir)
+        results["chunking"] = test_chunking_strategies(data, store_dir)
+        results["integrity"] = test_data_integrity(data, store_dir)
 
     total_time = time.time() - start_time
 
@@ -5,10 +5,155 @@ Generates various types of synthetic 3D volumes for testing benchmarking pipelin
 without requiring large downloads or specific datasets.
 """
 
-from typing import Literal
+import hashlib
+import math
+import multiprocessing
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from itertools import repeat
+from typing import Literal, Optional
 
 import numpy as np
 
+# Spheres have a Gaussian profile with sigma = radius / 2, so they are only evaluated
+# within a cube of this many radii (6 sigma) around their centre
+_SPHERE_EXTENT = 3
+
+# Where load_synthetic_volume keeps generated volumes between runs
+DEFAULT_CACHE_DIR = pathlib.Path("data/output/_synthetic_cache")
+
+if find_spec("numba"):
+    import numba
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _add_spheres(data, centres, radii, intensities):
+        """Add Gaussian-profile spheres to `data`, one pass over the voxels"""
+        nz, ny, nx = data.shape
+        for i in numba.prange(nz):
+            for j in range(ny):
+                for k in range(nx):
+                    s = 0.0
+                    for m in range(radii.size):
+                        dz = i - centres[m, 0]
+                        dy = j - centres[m, 1]
+                        dx = k - centres[m, 2]
+                        extent = _SPHERE_EXTENT * radii[m]
+                        if abs(dz) > extent or abs(dy) > extent or abs(dx) > extent:
+                            continue
+                        d2 = dz * dz + dy * dy + dx * dx
+                        s += intensities[m] * math.exp(-d2 / (2 * (radii[m] / 2) ** 2))
+                    data[i, j, k] += s
+
+    @numba.njit(cache=True)
+    def _add_filament(data, start, direction, length, thickness, intensity):
+        """Add a straight filament of the given thickness, wrapping at the edges"""
+        size = data.shape[0]
+        for t in range(length):
+            pt_z = int(start[0] + direction[0] * t) % size
+            pt_y = int(start[1] + direction[1] * t) % size
+            pt_x = int(start[2] + direction[2] * t) % size
+            for dz in range(-thickness, thickness + 1):
+                for dy in range(-thickness, thickness + 1):
+                    for dx in range(-thickness, thickness + 1):
+                        if dz * dz + dy * dy + dx * dx <= thickness * thickness:
+                            data[
+                                (pt_z + dz) % size,
+                                (pt_y + dy) % size,
+                                (pt_x + dx) % size,
+                            ] += intensity
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _normalise(data):
+        """Scale `data` in place to zero mean and unit standard deviation"""
+        flat = data.reshape(-1)
+        # Mean and variance from one pass of float64 sums
+        total = 0.0
+        total_sq = 0.0
+        for i in numba.prange(flat.size):
+            x = np.float64(flat[i])
+            total += x
+            total_sq += x * x
+        mean = total / flat.size
+        std = math.sqrt(max(total_sq / flat.size - mean * mean, 0.0))
+        scale = 1.0 / (std + 1e-10)
+        for i in numba.prange(flat.size):
+            flat[i] = (flat[i] - mean) * scale
+
+else:
+    # numba is optional - without it the same structures are added with NumPy
+
+    def _add_spheres(data, centres, radii, intensities):
+        """Add Gaussian-profile spheres to `data`, one sphere at a time"""
+        for centre, radius, intensity in zip(centres, radii, intensities):
+            # Only the sphere's bounding cube, clipped to the volume (no wrapping)
+            extent = _SPHERE_EXTENT * radius
+            lo = np.maximum(centre - extent, 0)
+            hi = np.minimum(centre + extent + 1, data.shape)
+            box = tuple(slice(a, b) for a, b in zip(lo, hi))
+            # Open grids of offsets from the centre - the distance expression
+            # broadcasts them to the box. They're in the volume's dtype, so the
+            # box-sized temporaries aren't float64 for a float32 volume
+            z, y, x = (
+                (axis - c).astype(data.dtype) for axis, c in zip(np.ogrid[box], centre)
+            )
+            # The profile is built up in place in the one box-sized array
+            profile = z**2 + y**2 + x**2
+            profile *= data.dtype.type(-1 / (2 * (radius / 2) ** 2))
+            np.exp(profile, out=profile)
+            profile *= data.dtype.type(intensity)
+            data[box] += profile
+
+    def _add_filament(data, start, direction, length, thickness, intensity):
+        """Add a straight filament of the given thickness, wrapping at the edges"""
+        size = data.shape[0]
+        # Offsets of every voxel within `thickness` of a point on the filament
+        dz, dy, dx = np.ogrid[
+            -thickness : thickness + 1,
+            -thickness : thickness + 1,
+            -thickness : thickness + 1,
+        ]
+        offsets = np.argwhere(dz**2 + dy**2 + dx**2 <= thickness**2) - thickness
+
+        # Points along the filament (truncated towards zero, then wrapped)
+        points = (start + np.outer(np.arange(length), direction)).astype(int) % size
+
+        # Add thickness - np.add.at accumulates where the balls of consecutive
+        # points overlap, as repeated `+=` would
+        for point in points:
+            iz, iy, ix = ((point + offsets) % size).T
+            np.add.at(data, (iz, iy, ix), intensity)
+
+    def _normalise(data):
+        """Scale `data` in place to zero mean and unit standard deviation"""
+        mean = data.mean()
+        std = data.std()
+        np.subtract(data, mean, out=data)
+        data /= std + 1e-10
+
+
+def _fourier_upsample(volume: np.ndarray, size: int) -> np.ndarray:
+    """Band-limited upsampling of a cubic volume to size³ by zero-padding its FFT"""
+    n = volume.shape[0]
+    # Centre the full-length axes so the low-resolution spectrum can be pasted into
+    # the middle of the larger one (the half-length rfft axis starts at zero)
+    spectrum = np.fft.fftshift(np.fft.rfftn(volume), axes=(0, 1))
+    if n % 2 == 0:
+        # The Nyquist planes of an even-length spectrum would need splitting between
+        # positive and negative frequencies in the larger one - just drop them
+        spectrum[0] = 0
+        spectrum[:, 0] = 0
+        spectrum[..., -1] = 0
+    padded = np.zeros((size, size, size // 2 + 1), dtype=spectrum.dtype)
+    offset = size // 2 - n // 2
+    padded[offset : offset + n, offset : offset + n, : n // 2 + 1] = spectrum
+    upsampled = np.fft.irfftn(
+        np.fft.ifftshift(padded, axes=(0, 1)), s=(size, size, size), axes=(0, 1, 2)
+    )
+    # irfftn normalises by the larger volume, so rescale to the original amplitude
+    return upsampled * (size / n) ** 3
+
 
 def generate_synthetic_volume(
     size: int = 256,
@@ -39,106 +184,128 @@ def generate_synthetic_volume(
     np.ndarray
         3D volume of shape (size, size, size)
     """
-    np.random.seed(seed)
+    # A local generator, rather than reseeding NumPy's global random state
+    rng = np.random.default_rng(seed)
+    # The generator can fill float32 directly, saving a float64 volume and a cast
+    noise_dtype = np.float32 if np.dtype(dtype) == np.float32 else np.float64
 
     if pattern == "noise":
         # Pure Gaussian noise
-        data = np.random.randn(size, size, size).astype(dtype)
+        data = rng.standard_normal((size, size, size), dtype=noise_dtype)
+        data = data.astype(dtype, copy=False)
 
     elif pattern == "gradient":
         # Smooth 3D gradient
-        z, y, x = np.mgrid[0:size, 0:size, 0:size]
-        data = (z + y + x).astype(dtype) / (3 * size)
+        z, y, x = np.ogrid[0:size, 0:size, 0:size]
+        # Sum the broadcast coordinates straight into `dtype`, rather than
+        # materialising full int64 grids first (casting as astype would, so
+        # narrower integer dtypes wrap rather than raise)
+        data = np.add(z + y, x, dtype=dtype, casting="unsafe") / (3 * size)
 
     elif pattern == "spheres":
         # Multiple spheres with different intensities
         data = np.zeros((size, size, size), dtype=dtype)
-        z, y, x = np.mgrid[0:size, 0:size, 0:size]
 
         # Create 5 random spheres
+        centres, radii, intensities = [], [], []
         for i in range(5):
-            center_z = np.random.randint(size // 4, 3 * size // 4)
-            center_y = np.random.randint(size // 4, 3 * size // 4)
-            center_x = np.random.randint(size // 4, 3 * size // 4)
-            radius = np.random.randint(size // 8, size // 4)
-            intensity = np.random.rand() * 10
-
-            dist = np.sqrt(
-                (z - center_z) ** 2 + (y - center_y) ** 2 + (x - center_x) ** 2
-            )
-            sphere = intensity * np.exp(-(dist**2) / (2 * (radius / 2) ** 2))
-            data += sphere
+            centres.append(rng.integers(size // 4, 3 * size // 4, size=3))
+            radii.append(rng.integers(size // 8, size // 4))
+            intensities.append(rng.random() * 10)
+        _add_spheres(data, np.array(centres), np.array(radii), np.array(intensities))
 
     elif pattern == "realistic":
         # Simulate realistic microscopy data
         # Base noise
-        data = np.random.randn(size, size, size).astype(dtype) * 0.1
+        data = rng.standard_normal((size, size, size), dtype=noise_dtype)
+        data = data.astype(dtype, copy=False)
+        if np.issubdtype(data.dtype, np.floating):
+            data *= 0.1
+        else:
+            # An integer volume can't be scaled in place - it becomes float64
+            data = data * 0.1
 
         # Add structures (spheres + elongated features)
-        z, y, x = np.mgrid[0:size, 0:size, 0:size]
 
         # Spherical structures
+        centres, radii, intensities = [], [], []
         for i in range(8):
-            center_z = np.random.randint(size // 4, 3 * size // 4)
-            center_y = np.random.randint(size // 4, 3 * size // 4)
-            center_x = np.random.randint(size // 4, 3 * size // 4)
-            radius = np.random.randint(size // 12, size // 6)
-            intensity = np.random.rand() * 2 + 1
-
-            dist = np.sqrt(
-                (z - center_z) ** 2 + (y - center_y) ** 2 + (x - center_x) ** 2
-            )
-            sphere = intensity * np.exp(-(dist**2) / (2 * (radius / 2) ** 2))
-            data += sphere
+            centres.append(rng.integers(size // 4, 3 * size // 4, size=3))
+            radii.append(rng.integers(size // 12, size // 6))
+            intensities.append(rng.random() * 2 + 1)
+        _add_spheres(data, np.array(centres), np.array(radii), np.array(intensities))
 
         # Elongated features (filaments)
         for i in range(3):
-            start_z = np.random.randint(0, size)
-            start_y = np.random.randint(0, size)
-            start_x = np.random.randint(0, size)
+            start = rng.integers(0, size, size=3)
 
-            direction = np.random.randn(3)
+            direction = rng.standard_normal(3)
             direction = direction / np.linalg.norm(direction)
 
-            length = np.random.randint(size // 4, size // 2)
-            thickness = np.random.randint(size // 20, size // 10)
-            intensity = np.random.rand() * 1.5 + 0.5
-
-            for t in range(length):
-                pt_z = int(start_z + direction[0] * t) % size
-                pt_y = int(start_y + direction[1] * t) % size
-                pt_x = int(start_x + direction[2] * t) % size
-
-                # Add thickness
-                for dz in range(-thickness, thickness + 1):
-                    for dy in range(-thickness, thickness + 1):
-                        for dx in range(-thickness, thickness + 1):
-                            if np.sqrt(dz**2 + dy**2 + dx**2) <= thickness:
-                                iz = (pt_z + dz) % size
-                                iy = (pt_y + dy) % size
-                                ix = (pt_x + dx) % size
-                                data[iz, iy, ix] += intensity
-
-        # Add smooth background variation
-        z_low, y_low, x_low = np.mgrid[
-            0 : size : size // 4, 0 : size : size // 4, 0 : size : size // 4
-        ]
-        background = np.random.randn(size // 4, size // 4, size // 4) * 0.5
+            length = rng.integers(size // 4, size // 2)
+            thickness = rng.integers(size // 20, size // 10)
+            intensity = rng.random() * 1.5 + 0.5
 
-        from scipy.ndimage import zoom
+            _add_filament(data, start, direction, length, thickness, intensity)
 
-        background_full = zoom(background, 4, order=3)[:size, :size, :size]
-        data += background_full
+        # Add smooth background variation (upsampled in the volume's precision, so
+        # a float32 volume gets a complex64 rather than complex128 spectrum)
+        background = rng.standard_normal((size // 4, size // 4, size // 4)) * 0.5
+        data += _fourier_upsample(background.astype(noise_dtype), size)
 
     else:
         raise ValueError(f"Unknown pattern: {pattern}")
 
-    # Normalize to reasonable range
-    data = (data - data.mean()) / (data.std() + 1e-10)
+    # Normalize to reasonable range, in place (integer volumes are promoted first)
+    if not np.issubdtype(data.dtype, np.floating):
+        data = data.astype(np.float64)
+    _normalise(data)
 
     return data
 
 
+def load_synthetic_volume(
+    size: int = 256,
+    dtype: np.dtype = np.float32,
+    pattern: Literal["noise", "gradient", "spheres", "realistic"] = "realistic",
+    seed: int = 42,
+    cache_dir: pathlib.Path = DEFAULT_CACHE_DIR,
+    mmap_mode: Optional[Literal["r", "r+", "c"]] = None,
+) -> np.ndarray:
+    """
+    Generate a synthetic volume, or load it from an earlier run's disk cache.
+
+    Takes the same arguments as generate_synthetic_volume, plus:
+
+    Parameters
+    ----------
+    cache_dir : pathlib.Path
+        Directory holding the cached .npy volumes
+    mmap_mode : str, optional
+        Passed to np.load for a cached volume - 'r' memory-maps it read-only, for
+        callers that only need a view
+
+    Returns
+    -------
+    np.ndarray
+        3D volume of shape (size, size, size)
+    """
+    # The generator is deterministic, so a volume only changes with its arguments or
+    # with the generator code itself - the key includes a hash of the latter
+    source_hash = hashlib.sha1(pathlib.Path(__file__).read_bytes()).hexdigest()
+    key = hashlib.sha1(
+        repr((size, np.dtype(dtype).str, pattern, seed, source_hash)).encode()
+    ).hexdigest()[:16]
+    cache_path = pathlib.Path(cache_dir) / f"{pattern}_{size}_{key}.npy"
+    if cache_path.exists():
+        return np.load(cache_path, mmap_mode=mmap_mode)
+
+    data = generate_synthetic_volume(size, dtype, pattern, seed)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(cache_path, data)
+    return data
+
+
 def get_test_dataset_info(pattern: str = "realistic") -> dict:
     """
     Get description and properties of test dataset.
@@ -187,17 +354,34 @@ if __name__ == "__main__":
     # Test generation
     print("Testing synthetic data generation...")
 
-    for pattern in ["noise", "gradient", "spheres", "realistic"]:
-        print(f"\n{pattern.upper()}:")
-        data = generate_synthetic_volume(size=128, pattern=pattern)
-        info = get_test_dataset_info(pattern)
-
-        print(f"  Name: {info.get('name', 'N/A')}")
-        print(f"  Shape: {data.shape}")
-        print(f"  Dtype: {data.dtype}")
-        print(f"  Range: [{data.min():.3f}, {data.max():.3f}]")
-        print(f"  Mean: {data.mean():.3f} ± {data.std():.3f}")
-        print(f"  Description: {info.get('description', 'N/A')}")
-        print(f"  Compressibility: {info.get('compressibility', 'N/A')}")
+    # The patterns are independent, so generate them in parallel. Workers are spawned
+    # (forking after numba has started its threads can deadlock) and inherit these
+    # variables, which split the cores between them rather than each worker
+    # starting a BLAS / numba thread per core
+    patterns = ["noise", "gradient", "spheres", "realistic"]
+    n_cores = os.cpu_count() or 1
+    n_workers = min(len(patterns), n_cores)
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, "1")
+    os.environ.setdefault("NUMBA_NUM_THREADS", str(max(1, n_cores // n_workers)))
+
+    with ProcessPoolExecutor(
+        n_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        volumes = executor.map(
+            generate_synthetic_volume, repeat(128), repeat(np.float32), patterns
+        )
+
+        for pattern, data in zip(patterns, volumes):
+            print(f"\n{pattern.upper()}:")
+            info = get_test_dataset_info(pattern)
+
+            print(f"  Name: {info.get('name', 'N/A')}")
+            print(f"  Shape: {data.shape}")
+            print(f"  Dtype: {data.dtype}")
+            print(f"  Range: [{data.min():.3f}, {data.max():.3f}]")
+            print(f"  Mean: {data.mean():.3f} ± {data.std():.3f}")
+            print(f"  Description: {info.get('description', 'N/A')}")
+            print(f"  Compressibility: {info.get('compressibility', 'N/A')}")
 
     print("\n✓ All patterns generated successfully")
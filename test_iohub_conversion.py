@@ -13,7 +13,7 @@ import time
 import numpy as np
 from iohub import open_ome_zarr
 
-from test_data_generator import generate_synthetic_volume
+from test_data_generator import load_synthetic_volume
 from zarr_benchmarks import utils
 
 # Enable v3
@@ -28,7 +28,7 @@ def test_iohub_zarr_creation():
 
     # Generate test data
     print("\n1. Generating synthetic data...")
-    data = generate_synthetic_volume(size=128, pattern="realistic")
+    data = load_synthetic_volume(size=128, pattern="realistic")
     print(f"   Shape: {data.shape}")
     print(f"   Size: {data.nbytes / (1024**2):.2f} MB")
 
@@ -59,7 +59,8 @@ def test_iohub_zarr_creation():
         t0 = time.time()
         with open_ome_zarr(str(zarr_v2_path), mode="r") as dataset:
             position = dataset["A/1/0"]
-            read_data = np.array(position["0"][0, 0, ...])  # Remove T, C
+            # Indexing already reads into a new ndarray, so no np.array() copy
+            read_data = position["0"][0, 0]  # Remove T, C
         read_time = time.time() - t0
 
         # Verify
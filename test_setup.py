@@ -56,7 +56,7 @@ storage_size = utils.get_directory_size(store_path) / (1024**2)
 print("\n4. Results:")
 print(f"   Compression ratio: {compression_ratio:.2f}x")
 print(f"   Storage size: {storage_size:.2f} MB")
-print(f"   Data integrity: {np.allclose(test_data, read_data)}")
+print(f"   Data integrity: {np.array_equal(test_data, read_data)}")
 
 print("\n" + "=" * 60)
 print("✓ All tests passed! Setup is working correctly.")
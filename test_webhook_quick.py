@@ -2,11 +2,37 @@
 """Quick test of webhook server with a small benchmark"""
 
 import asyncio
+import json
+import random
+from importlib.util import find_spec
 
 import aiohttp
 
+# orjson is optional - when installed it parses the status polls (and serialises
+# the request bodies) in C, otherwise the stdlib json module is used
+if find_spec("orjson"):
+    import orjson
 
-async def test_small_benchmark():
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+SERVER_URL = "http://127.0.0.1:8080"
+
+
+async def fetch_health(session: aiohttp.ClientSession) -> dict:
+    """Fetch the server's health report"""
+    async with session.get("/health") as resp:
+        resp.raise_for_status()
+        return await resp.json(loads=_json_loads)
+
+
+async def test_small_benchmark(session: aiohttp.ClientSession):
     """Test with a very small dataset for quick validation"""
     print("Testing webhook server with small CryoET dataset (32³)...")
 
@@ -25,91 +51,110 @@ async def test_small_benchmark():
         },
     }
 
-    async with aiohttp.ClientSession() as session:
-        # Submit job
-        print("\n→ Submitting benchmark job...")
-        async with session.post(
-            "http://127.0.0.1:8080/webhook/benchmark", json=config
-        ) as resp:
-            if resp.status != 202:
-                print(f"❌ Error: Status {resp.status}")
-                print(await resp.text())
-                return
-
-            job_info = await resp.json()
-            job_id = job_info["job_id"]
-            print(f"✓ Job submitted: {job_id}")
-
-        # Poll for completion
-        print("\n→ Polling for completion...")
-        max_polls = 60  # 2 minutes max
-        poll_count = 0
-
-        while poll_count < max_polls:
-            await asyncio.sleep(2)
-            poll_count += 1
-
-            async with session.get(f"http://127.0.0.1:8080/status/{job_id}") as resp:
-                status = await resp.json()
-
-                if status["status"] == "completed":
-                    print(f"✓ Job completed! (after {poll_count * 2}s)")
-
-                    # Display results
-                    results = status.get("results", {})
-                    print(f"\n{'=' * 60}")
-                    print("RESULTS")
-                    print(f"{'=' * 60}")
-
-                    # Print raw results for debugging
-                    if isinstance(results, dict):
-                        print(f"Dataset: {results.get('dataset_name', 'N/A')}")
-                        print(f"Results keys: {list(results.keys())}")
-
-                        # Try to display key metrics if available
-                        if "summary" in results:
-                            summary = results["summary"]
-                            print("\nSummary:")
-                            print(f"  Best Write: {summary.get('best_write', 'N/A')}")
-                            print(f"  Best Read: {summary.get('best_read', 'N/A')}")
-                            print(
-                                f"  Best Compression: {summary.get('best_compression', 'N/A')}"
-                            )
-                        else:
-                            print("\nRaw results:")
-                            import json
-
-                            print(json.dumps(results, indent=2, default=str))
+    # Submit job
+    print("\n→ Submitting benchmark job...")
+    async with session.post("/webhook/benchmark", json=config) as resp:
+        if resp.status != 202:
+            print(f"❌ Error: Status {resp.status}")
+            print(await resp.text())
+            return
+
+        job_info = await resp.json(loads=_json_loads)
+        job_id = job_info["job_id"]
+        print(f"✓ Job submitted: {job_id}")
+
+    # Poll for completion. Each request long-polls, so the server answers as soon as
+    # the job finishes; if it returns early (or doesn't support `wait`), back off
+    # from 0.1s to 2s with jitter before asking again
+    print("\n→ Polling for completion...")
+    timeout = 120  # 2 minutes max
+    delay = 0.1
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    while (remaining := timeout - (loop.time() - start)) > 0:
+        params = {"wait": f"{min(remaining, 30):.1f}"}
+        async with session.get(f"/status/{job_id}", params=params) as resp:
+            status = await resp.json(loads=_json_loads)
+            elapsed = loop.time() - start
+
+            if status["status"] == "completed":
+                print(f"✓ Job completed! (after {elapsed:.1f}s)")
+
+                # Display results
+                results = status.get("results", {})
+                print(f"\n{'=' * 60}")
+                print("RESULTS")
+                print(f"{'=' * 60}")
+
+                # Print raw results for debugging
+                if isinstance(results, dict):
+                    print(f"Dataset: {results.get('dataset_name', 'N/A')}")
+                    print(f"Results keys: {list(results.keys())}")
+
+                    # Try to display key metrics if available
+                    if "summary" in results:
+                        summary = results["summary"]
+                        print("\nSummary:")
+                        print(f"  Best Write: {summary.get('best_write', 'N/A')}")
+                        print(f"  Best Read: {summary.get('best_read', 'N/A')}")
+                        print(
+                            f"  Best Compression: {summary.get('best_compression', 'N/A')}"
+                        )
                     else:
-                        print(f"Results: {results}")
+                        print("\nRaw results:")
+                        print(json.dumps(results, indent=2, default=str))
+                else:
+                    print(f"Results: {results}")
+
+                print(f"{'=' * 60}")
+                return True
 
-                    print(f"{'=' * 60}")
-                    return True
+            elif status["status"] == "failed":
+                print(f"❌ Job failed: {status.get('error', 'Unknown error')}")
+                return False
 
-                elif status["status"] == "failed":
-                    print(f"❌ Job failed: {status.get('error', 'Unknown error')}")
-                    return False
+            elif status["status"] == "running":
+                print(f"  Still running... ({elapsed:.1f}s elapsed)")
+            elif status["status"] == "pending":
+                print(f"  Pending... ({elapsed:.1f}s elapsed)")
 
-                elif status["status"] == "running":
-                    print(f"  Still running... ({poll_count * 2}s elapsed)")
-                elif status["status"] == "pending":
-                    print(f"  Pending... ({poll_count * 2}s elapsed)")
+        await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+        delay = min(delay * 1.5, 2.0)
 
-        print(f"⏱️ Timeout after {max_polls * 2}s")
-        return False
+    print(f"⏱️ Timeout after {timeout}s")
+    return False
 
 
 async def main():
     try:
-        # Test health first
-        async with aiohttp.ClientSession() as session:
-            async with session.get("http://127.0.0.1:8080/health") as resp:
-                health = await resp.json()
-                print(f"Server Status: {health['status']}")
-                print(f"Jobs: {health['jobs']}")
-
-        # Run test
-        success = await test_small_benchmark()
+        # One session for every request, so the health check, submission and polls
+        # all reuse the same keep-alive connection
+        connector = aiohttp.TCPConnector(limit=4, keepalive_timeout=120)
+        async with aiohttp.ClientSession(
+            SERVER_URL, connector=connector, json_serialize=_json_dumps
+        ) as session:
+            # The health check and the test are independent, so run them
+            # concurrently rather than waiting a round trip before submitting. Both
+            # are always awaited to completion, so neither outlives the session
+            health, success = await asyncio.gather(
+                fetch_health(session),
+                test_small_benchmark(session),
+                return_exceptions=True,
+            )
+        if isinstance(success, BaseException):
+            raise success
+
+        # The health report is printed once the test is done, rather than
+        # interleaved with its output, and still gates the result
+        print()
+        if isinstance(health, BaseException):
+            print(f"❌ Health check failed: {health}")
+            success = False
+        else:
+            print(f"Server Status: {health.get('status')}")
+            print(f"Jobs: {health.get('jobs')}")
+            success = success and health.get("status") == "healthy"
 
         if success:
             print("\n✓ Webhook server test PASSED")
@@ -117,7 +162,7 @@ async def main():
             print("\n❌ Webhook server test FAILED")
 
     except aiohttp.ClientConnectorError:
-        print("❌ Could not connect to server at http://127.0.0.1:8080")
+        print(f"❌ Could not connect to server at {SERVER_URL}")
         print("Make sure the server is running:")
         print("  python benchmark_webhook_server.py")
 
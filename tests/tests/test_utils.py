@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from zarr_benchmarks import utils
+
+# Independent of the zarr implementation, so run once
+pytestmark = [pytest.mark.tensorstore]
+
+
+@pytest.fixture
+def volume():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((32, 32, 32), dtype=np.float32)
+
+
+@pytest.mark.parametrize(
+    "make_other",
+    [
+        pytest.param(lambda a: a + np.float32(0.5) * a[::-1], id="correlated"),
+        pytest.param(lambda a: -a, id="anti-correlated"),
+        pytest.param(np.zeros_like, id="all-zero"),
+        pytest.param(lambda a: np.full_like(a, 0.1), id="constant"),
+    ],
+)
+def test_pearson_correlation(volume, make_other):
+    """Check pearson_correlation against np.corrcoef, including zero-variance inputs"""
+
+    other = make_other(volume)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = np.corrcoef(volume.ravel(), other.ravel())[0, 1]
+
+    assert np.isclose(
+        utils.pearson_correlation(volume, other), expected, equal_nan=True
+    )
+
+
+def test_arrays_match_exact(volume):
+    """Check atol=0 requires the arrays to be identical"""
+
+    assert utils.arrays_match(volume, volume.copy())
+
+    changed = volume.copy()
+    changed[0, 0, 0] = np.nextafter(changed[0, 0, 0], np.float32(np.inf))
+    assert not utils.arrays_match(volume, changed)
+
+
+@pytest.mark.parametrize("error, expected", [(1e-3, True), (1e-1, False)])
+def test_arrays_match_atol(error, expected):
+    """Check arrays match within atol and not outside it"""
+
+    # Long enough along the first axis to be compared in several slabs, with the
+    # difference in the last (partial) one
+    image = np.zeros((150, 4, 4), dtype=np.float32)
+    changed = image.copy()
+    changed[-1, -1, -1] += np.float32(error)
+
+    assert utils.arrays_match(image, changed, atol=1e-2) is expected
+
+
+@pytest.mark.parametrize("atol", [0.0, 1e-2])
+def test_arrays_match_shape_mismatch(volume, atol):
+    """Check arrays of different shapes don't match"""
+
+    assert not utils.arrays_match(volume, volume[:-1], atol=atol)
@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+import benchmark_webhook_server  # noqa: E402
+from benchmark_webhook_server import (  # noqa: E402
+    BenchmarkJob,
+    BenchmarkWebhookServer,
+    JobStatus,
+)
+
+# Only depends on the server, so run once
+pytestmark = [pytest.mark.tensorstore]
+
+
+async def _get_status(params, finish_after=None):
+    """Query /status for a pending job, optionally finishing it after a delay"""
+
+    server = BenchmarkWebhookServer()
+    job = BenchmarkJob("job-1", {})
+    server.jobs[job.job_id] = job
+
+    async def finish():
+        await asyncio.sleep(finish_after)
+        job.status = JobStatus.COMPLETED
+        job.finished.set()
+
+    async with TestClient(TestServer(server.make_app())) as client:
+        if finish_after is not None:
+            finisher = asyncio.create_task(finish())
+        start = time.perf_counter()
+        response = await client.get(f"/status/{job.job_id}", params=params)
+        elapsed = time.perf_counter() - start
+        body = await response.json()
+        if finish_after is not None:
+            await finisher
+
+    return response.status, body, elapsed
+
+
+def test_status_long_poll_returns_on_finish():
+    """Check a long-poll returns as soon as the job finishes, not at the wait limit"""
+
+    status, body, elapsed = asyncio.run(_get_status({"wait": "10"}, finish_after=0.1))
+
+    assert status == 200
+    assert body["status"] == JobStatus.COMPLETED.value
+    assert elapsed < 5
+
+
+def test_status_long_poll_capped(monkeypatch):
+    """Check a long-poll longer than MAX_STATUS_WAIT is cut short"""
+
+    monkeypatch.setattr(benchmark_webhook_server, "MAX_STATUS_WAIT", 0.1)
+
+    status, body, elapsed = asyncio.run(_get_status({"wait": "30"}))
+
+    assert status == 200
+    assert body["status"] == JobStatus.PENDING.value
+    assert elapsed < 5
+
+
+@pytest.mark.parametrize("wait", ["abc", "nan", "inf"])
+def test_status_invalid_wait(wait):
+    """Check a non-numeric or non-finite wait is rejected"""
+
+    status, body, _ = asyncio.run(_get_status({"wait": wait}))
+
+    assert status == 400
+    assert "error" in body
@@ -4,6 +4,7 @@ from importlib.util import find_spec
 import numpy as np
 import pytest
 
+from zarr_benchmarks import utils
 from zarr_benchmarks.read_write_zarr import read_write_zarr
 from zarr_benchmarks.utils import is_zarr_python_v2
 
@@ -55,6 +56,123 @@ def test_write_empty_chunks_spec_2(tmp_path, write_empty_chunks):
     assert (store_path / "0.0.0").exists() == write_empty_chunks
 
 
+def _skip_if_tensorstore():
+    if find_spec("tensorstore") is not None:
+        pytest.skip("Only supported for zarr-python")
+
+
+def test_zip_store_round_trip(tmp_path):
+    """Check an array can be written to, read from, measured and removed as a .zip store"""
+
+    _skip_if_tensorstore()
+
+    image = np.arange(32**3, dtype=np.float32).reshape(32, 32, 32)
+    store_path = tmp_path / "image.zip"
+
+    read_write_zarr.write_zarr_array(
+        image,
+        store_path,
+        overwrite=True,
+        chunks=(16, 16, 16),
+        compressor=read_write_zarr.get_gzip_compressor(6, zarr_spec=2),
+        zarr_spec=2,
+    )
+
+    assert store_path.is_file()
+    np.testing.assert_array_equal(read_write_zarr.read_zarr_array(store_path), image)
+    assert read_write_zarr.get_compression_ratio(store_path, zarr_spec=2) > 1
+    assert utils.get_directory_size(store_path) == store_path.stat().st_size
+
+    utils.remove_output_dir(store_path)
+    assert not store_path.exists()
+
+
+def test_zip_store_no_overwrite(tmp_path):
+    """Check writing to an existing .zip store with overwrite=False fails rather than
+    truncating it"""
+
+    _skip_if_tensorstore()
+
+    image = np.ones(shape=(4, 4, 4))
+    store_path = tmp_path / "image.zip"
+
+    write_kwargs = dict(chunks=(2, 2, 2), compressor=None, zarr_spec=2)
+    read_write_zarr.write_zarr_array(image, store_path, overwrite=True, **write_kwargs)
+
+    with pytest.raises(FileExistsError):
+        read_write_zarr.write_zarr_array(
+            image * 2, store_path, overwrite=False, **write_kwargs
+        )
+
+    np.testing.assert_array_equal(read_write_zarr.read_zarr_array(store_path), image)
+
+
+def test_read_into_out(tmp_path):
+    """Check read_zarr_array fills a preallocated `out` array"""
+
+    _skip_if_tensorstore()
+
+    image = np.random.rand(8, 8, 8)
+    store_path = tmp_path / "image.zarr"
+
+    read_write_zarr.write_zarr_array(
+        image,
+        store_path,
+        overwrite=True,
+        chunks=(4, 4, 4),
+        compressor=None,
+        zarr_spec=2,
+    )
+
+    out = np.empty_like(image)
+    read_write_zarr.read_zarr_array(store_path, out=out)
+    np.testing.assert_array_equal(out, image)
+
+
+def test_libdeflate_gzip_round_trip(tmp_path):
+    """Check an array compressed with libdeflate gzip can be written and read back"""
+
+    pytest.importorskip("deflate")
+    _skip_if_tensorstore()
+
+    image = np.arange(32**3, dtype=np.uint16).reshape(32, 32, 32)
+    store_path = tmp_path / "image.zarr"
+
+    read_write_zarr.write_zarr_array(
+        image,
+        store_path,
+        overwrite=True,
+        chunks=(16, 16, 16),
+        compressor=read_write_zarr.get_libdeflate_compressor(6, zarr_spec=2),
+        zarr_spec=2,
+    )
+
+    np.testing.assert_array_equal(read_write_zarr.read_zarr_array(store_path), image)
+
+
+def test_libdeflate_gzip_compatible_with_gzip():
+    """Check libdeflate gzip output is interchangeable with numcodecs' GZip"""
+
+    pytest.importorskip("deflate")
+    from numcodecs import GZip
+
+    from zarr_benchmarks.read_write_zarr.read_write_zarr_python_utils import (
+        LibdeflateGZip,
+    )
+
+    data = np.arange(4096, dtype=np.int32)
+    libdeflate_gzip = LibdeflateGZip(level=6)
+    gzip = GZip(level=6)
+
+    assert libdeflate_gzip.get_config()["id"] == "gzip"
+    np.testing.assert_array_equal(
+        np.frombuffer(gzip.decode(libdeflate_gzip.encode(data)), dtype=data.dtype), data
+    )
+    np.testing.assert_array_equal(
+        np.frombuffer(libdeflate_gzip.decode(gzip.encode(data)), dtype=data.dtype), data
+    )
+
+
 def test_read_write_zarr_import():
     """Check that the correct package is imported as read_write_zarr for each tox environment"""
 